@@ -1,38 +1,57 @@
 import streamlit as st
-import sys
+import hashlib
+import io
 import os
+import pickle
+import re
+import numpy as np
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 
-sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
-
-from data.data_loader import DataLoaderFactory
-from data.data_processor import DataProcessor, CountryAggregationStrategy, RegionAggregationStrategy
-from utils.observers import DataManager
-from utils.consts import MAP_CONFIG
-from visual.chart import ChartVisualizer
-from visual.pdf import PDFExporter
+from src.data.data_loader import DataLoaderFactory
+from src.data.data_processor import (
+    DataProcessor,
+    CountryAggregationStrategy,
+    RegionAggregationStrategy,
+    TopNStrategy
+)
+from src.utils.observers import DataManager
+from src.utils.consts import MAP_CONFIG
+from src.visual.chart import ChartVisualizer
+from src.visual.pdf import PDFExporter
 
 try:
-    from visual.map import MapVisualizer
+    from src.visual.map import MapVisualizer
     import streamlit_folium as st_folium
     HAS_MAPS = True
 except ImportError:
     HAS_MAPS = False
 
+_MAP_OPTION = ["Mapa interaktywna"] if HAS_MAPS else []
+VIZ_OPTIONS_ENV = _MAP_OPTION + ["Tabela krajów", "Statystyki"]
+VIZ_OPTIONS_TRAN = _MAP_OPTION + ["Tabela regionów"]
+
+_REFRESH_EVENTS = frozenset({'year_range_changed', 'countries_selected', 'filter_applied'})
+
 
 def init_session_state():
     if 'initialized' not in st.session_state:
         st.session_state.data_manager = DataManager()
-        st.session_state.data_processor = DataProcessor(CountryAggregationStrategy())
+        st.session_state.processors = {
+            'country': DataProcessor(CountryAggregationStrategy()),
+            'region': DataProcessor(RegionAggregationStrategy()),
+            'top5': DataProcessor(TopNStrategy(n=5))
+        }
         st.session_state.chart_visualizer = ChartVisualizer()
         st.session_state.pdf_exporter = PDFExporter()
         st.session_state.data_loaded = False
         
-        from utils.observers import StreamlitObserverBridge
+        from src.utils.observers import StreamlitObserverBridge
         st.session_state.observer_bridge = StreamlitObserverBridge(st.session_state.data_manager)
         
         def refresh_callback(event_type, data):
-            if event_type in ['year_range_changed', 'countries_selected', 'filter_applied']:
+            if event_type in _REFRESH_EVENTS:
                 st.session_state.refresh_needed = True
         
         st.session_state.observer_bridge.register_component("main", refresh_callback)
@@ -82,18 +101,19 @@ def main():
             
             st.subheader("Zakres czasowy")
             current_range = st.session_state.data_manager.year_range
-            
-            year_range = st.slider(
-                "Wybierz lata",
-                min_value=2013,
-                max_value=2022,
-                value=current_range,
-                key="year_range_slider"
-            )
-            
-            if year_range != current_range:
+
+            with st.form("year_form"):
+                year_range = st.slider(
+                    "Wybierz lata",
+                    min_value=2013,
+                    max_value=2022,
+                    value=current_range,
+                    key="year_range_slider"
+                )
+                submitted = st.form_submit_button("Zastosuj zakres lat")
+
+            if submitted and year_range != current_range:
                 st.session_state.data_manager.set_year_range(year_range)
-                st.rerun()
     
     if not st.session_state.data_loaded:
         show_welcome_screen()
@@ -114,55 +134,151 @@ def main():
             show_analysis_tab()
 
 
+DISK_CACHE_DIR = Path.home() / '.mappy_cache'
+
+# Bump when the pickled model layout changes.
+DISK_CACHE_VERSION = 2
+
+_SKIP_RE = re.compile(r'european union|euro area', re.IGNORECASE)
+
+
+def _disk_cached_load(data_type: str, file_bytes: bytes):
+    digest = hashlib.blake2b(file_bytes, digest_size=16).hexdigest()
+    cache_path = DISK_CACHE_DIR / f"{data_type}_v{DISK_CACHE_VERSION}_{digest}.pkl"
+
+    if cache_path.exists():
+        try:
+            return pickle.loads(cache_path.read_bytes())
+        except (pickle.PickleError, OSError, EOFError):
+            pass
+
+    data = DataLoaderFactory.create_loader(data_type).load(io.BytesIO(file_bytes))
+
+    if data:
+        try:
+            DISK_CACHE_DIR.mkdir(exist_ok=True)
+            cache_path.write_bytes(pickle.dumps(data))
+        except OSError:
+            pass
+
+    return data
+
+
+@st.cache_data(show_spinner=False)
+def _load_env(file_bytes: bytes):
+    return _disk_cached_load('environmental', file_bytes)
+
+
+@st.cache_data(show_spinner=False)
+def _load_tran(file_bytes: bytes):
+    return _disk_cached_load('transport', file_bytes)
+
+
+@st.cache_data(show_spinner=False)
+def _process_env(year_range: tuple, selected_key: tuple):
+    processor = st.session_state.processors['country']
+    return processor.process_data(
+        st.session_state.data_manager.get_filtered_env_data(),
+        year_range
+    )
+
+
+@st.cache_data(show_spinner=False)
+def _process_tran(year_range: tuple, filters_key: tuple):
+    processor = st.session_state.processors['region']
+    return processor.process_data(
+        st.session_state.data_manager.get_filtered_tran_data(),
+        year_range
+    )
+
+
+@st.cache_resource(show_spinner=False)
+def _background_executor() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=2)
+
+
+@st.cache_resource(show_spinner=False)
+def _map_visualizer(data_type: str) -> 'MapVisualizer':
+    return MapVisualizer(data_type)
+
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def _build_map(data_type: str, view_mode: str, year_range: tuple, data_signature: tuple, _data):
+    return _map_visualizer(data_type).create_map(_data, year_range, view_mode)
+
+
+def _map_signature(data) -> tuple:
+    return tuple(
+        (getattr(item, 'region_code', None) or item.country_code,
+         sum(item.data_by_year.values()))
+        for item in data
+    )
+
+
+@st.cache_data(show_spinner=False)
+def _bar_fig(result_signature: tuple, data_source: str, _result: dict):
+    return st.session_state.chart_visualizer.create_bar_chart(_result, data_source)
+
+
+@st.cache_data(show_spinner=False)
+def _line_fig(result_signature: tuple, data_source: str, _result: dict):
+    return st.session_state.chart_visualizer.create_line_chart(_result, data_source)
+
+
+def _result_signature(result) -> tuple:
+    names = result.get('countries') or result.get('regions') or result.get('names') or []
+    return (tuple(names), tuple(result['totals']), tuple(result['years']))
+
+
+@st.cache_data(show_spinner=False)
+def _to_csv(df: pd.DataFrame) -> bytes:
+    return df.to_csv(index=False).encode("utf-8")
+
+
+@st.cache_data(show_spinner=False)
+def _search_index(items: tuple):
+    items_arr = np.array(items, dtype=object)
+    lowered_arr = np.array([s.lower() for s in items], dtype=str)
+    return items_arr, lowered_arr
+
+
+def _env_selection_key(data_manager) -> tuple:
+    return (data_manager.data_version, tuple(data_manager.selected_countries))
+
+
+def _tran_filter_key(data_manager) -> tuple:
+    return (data_manager.data_version, tuple(sorted(data_manager.data_filter.items())))
+
+
 def load_data(env_file, tran_file):
     try:
-        factory = DataLoaderFactory()
-        progress_bar = st.progress(0)
-        status_text = st.empty()
-        
-        if env_file is not None:
-            status_text.text("Wczytywanie danych środowiskowych...")
-            progress_bar.progress(20)
-            
-            with open("temp_env.xlsx", "wb") as f:
-                f.write(env_file.getvalue())
-            
-            env_loader = factory.create_loader('environmental')
-            env_data = env_loader.load("temp_env.xlsx")
-            
-            if env_data:
-                st.session_state.data_manager.load_environmental_data(env_data)
-                progress_bar.progress(50)
-            
-            os.remove("temp_env.xlsx")
-        
-        if tran_file is not None:
-            status_text.text("Wczytywanie danych transportowych...")
-            progress_bar.progress(70)
-            
-            with open("temp_tran.xlsx", "wb") as f:
-                f.write(tran_file.getvalue())
-            
-            tran_loader = factory.create_loader('transport')
-            tran_data = tran_loader.load("temp_tran.xlsx")
-            
-            if tran_data:
-                st.session_state.data_manager.load_transport_data(tran_data)
-                progress_bar.progress(90)
-            
-            os.remove("temp_tran.xlsx")
-        
-        progress_bar.progress(100)
-        
+        with st.spinner("Wczytywanie danych..."):
+            executor = _background_executor()
+            env_future = None
+            tran_future = None
+
+            if env_file is not None:
+                env_future = executor.submit(_load_env, env_file.getvalue())
+
+            if tran_file is not None:
+                tran_future = executor.submit(_load_tran, tran_file.getvalue())
+
+            env_data = env_future.result() if env_future else None
+            tran_data = tran_future.result() if tran_future else None
+
+        if env_data:
+            st.session_state.data_manager.load_environmental_data(env_data)
+            st.session_state.available_countries = tuple(c.country_name for c in env_data)
+
+        if tran_data:
+            st.session_state.data_manager.load_transport_data(tran_data)
+
         if st.session_state.data_manager.env_data or st.session_state.data_manager.tran_data:
             st.session_state.data_loaded = True
-            status_text.empty()
-            progress_bar.empty()
             st.success("Dane załadowane pomyślnie")
-            st.rerun()
         else:
             st.error("Nie udało się załadować żadnych danych")
-            
+
     except Exception as e:
         st.error(f"Błąd wczytywania danych: {str(e)}")
 
@@ -194,6 +310,7 @@ def show_welcome_screen():
             st.warning("Mapy interaktywne niedostępne - brakuje pakietu streamlit-folium")
 
 
+@st.fragment
 def show_environmental_tab():
     data_manager = st.session_state.data_manager
     
@@ -210,28 +327,29 @@ def show_environmental_tab():
         
         view_mode = st.radio("Widok mapy:", ["Europa", "Polska"], key="env_view")
         
-        viz_options = ["Tabela krajów"]
-        if HAS_MAPS:
-            viz_options.insert(0, "Mapa interaktywna")
+        viz_type = st.radio("Typ wizualizacji:", VIZ_OPTIONS_ENV)
         
-        viz_type = st.radio("Typ wizualizacji:", viz_options)
-        
-        available_countries = [c.country_name for c in data_manager.env_data]
+        available_countries = st.session_state.get('available_countries', ())
         selected_countries = st.multiselect(
             "Wybierz kraje:",
             available_countries,
-            default=available_countries[:5]
+            default=list(available_countries[:5])
         )
-        
-        if selected_countries != data_manager.selected_countries:
+
+        current_selection = data_manager.selected_countries
+        if (len(selected_countries) != len(current_selection)
+                or set(selected_countries) != set(current_selection)):
             data_manager.set_selected_countries(selected_countries)
-            st.rerun()
     
     with col2:
+        result = _process_env(data_manager.year_range, _env_selection_key(data_manager))
+
         if viz_type == "Mapa interaktywna" and HAS_MAPS:
             show_environmental_map(view_mode)
+        elif viz_type == "Statystyki":
+            show_environmental_statistics(data_manager)
         else:
-            show_environmental_table()
+            show_environmental_table(result)
 
 
 def show_environmental_map(view_mode):
@@ -239,13 +357,15 @@ def show_environmental_map(view_mode):
         st.subheader("Mapa interaktywna - Pojazdy zutylizowane")
         
         data_manager = st.session_state.data_manager
-        map_visualizer = MapVisualizer('environmental')
-        
+        map_data = data_manager.get_filtered_env_data()
+
         with st.spinner("Generowanie mapy..."):
-            folium_map = map_visualizer.create_map(
-                data_manager.get_filtered_env_data(),
+            folium_map = _build_map(
+                'environmental',
+                view_mode,
                 data_manager.year_range,
-                view_mode
+                _map_signature(map_data),
+                map_data
             )
         
         st_folium.st_folium(folium_map, width=800, height=500)
@@ -253,41 +373,41 @@ def show_environmental_map(view_mode):
     except Exception as e:
         st.error(f"Błąd generowania mapy: {str(e)}")
         st.info("Przełączam na tabelę:")
-        show_environmental_table()
+        data_manager = st.session_state.data_manager
+        result = _process_env(data_manager.year_range, _env_selection_key(data_manager))
+        show_environmental_table(result)
 
 
-def show_environmental_table():
+def show_environmental_table(result):
     st.subheader("Dane krajów - Pojazdy zutylizowane")
-    
+
     data_manager = st.session_state.data_manager
-    processor = DataProcessor(CountryAggregationStrategy())
-    
-    result = processor.process_data(
-        data_manager.get_filtered_env_data(),
-        data_manager.year_range
-    )
-    
+
     if result['countries']:
-        display_data = []
-        for i, (country, values, total, avg) in enumerate(zip(
-            result['countries'], result['values'], result['totals'], result['averages']
-        )):
-            display_data.append({
-                'Lp.': i + 1,
-                'Kraj': country,
-                'Suma': f"{total:,.0f}",
-                'Średnia': f"{avg:,.0f}",
-                f'{data_manager.year_range[0]}': f"{values[0]:,.0f}" if values else "0",
-                f'{data_manager.year_range[1]}': f"{values[-1]:,.0f}" if len(values) > 1 else "0"
-            })
-        
-        df = pd.DataFrame(display_data)
-        st.dataframe(df, use_container_width=True)
-        
-        csv = df.to_csv(index=False)
+        year_start, year_end = data_manager.year_range
+        numeric_columns = ['Suma', 'Średnia', str(year_start), str(year_end)]
+
+        df = pd.DataFrame({
+            'Lp.': np.arange(1, len(result['countries']) + 1),
+            'Kraj': result['countries'],
+            'Suma': result['totals'],
+            'Średnia': result['averages'],
+            str(year_start): [v[0] if v else 0 for v in result['values']],
+            str(year_end): [v[-1] if len(v) > 1 else 0 for v in result['values']]
+        })
+
+        st.dataframe(
+            df,
+            use_container_width=True,
+            column_config={
+                col: st.column_config.NumberColumn(format="localized")
+                for col in numeric_columns
+            }
+        )
+        
         st.download_button(
             "Pobierz CSV",
-            data=csv,
+            data=_to_csv(df),
             file_name="environmental_data.csv",
             mime="text/csv"
         )
@@ -295,6 +415,71 @@ def show_environmental_table():
         st.info("Brak danych do wyświetlenia")
 
 
+def show_environmental_statistics(data_manager):
+    st.subheader("Statystyki - Pojazdy zutylizowane")
+
+    countries, totals, _ = data_manager.env_window(
+        data_manager.year_range,
+        data_manager.selected_countries or None
+    )
+
+    keep = totals > 0
+    countries = countries[keep]
+    totals = totals[keep]
+
+    if not len(countries):
+        st.info("Brak danych do wyświetlenia")
+        return
+
+    i_max = int(totals.argmax())
+    i_min = int(totals.argmin())
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.metric("Suma całkowita", f"{totals.sum():,.0f}")
+        st.metric("Średnia na kraj", f"{totals.mean():,.0f}")
+
+    with col2:
+        st.metric(f"Maksimum: {countries[i_max]}", f"{totals[i_max]:,.0f}")
+        st.metric(f"Minimum: {countries[i_min]}", f"{totals[i_min]:,.0f}")
+
+    st.subheader("Top 5 krajów")
+    top = st.session_state.processors['top5'].process_data(
+        data_manager.get_filtered_env_data(),
+        data_manager.year_range
+    )
+
+    top_df = pd.DataFrame({
+        'Lp.': np.arange(1, len(top['names']) + 1),
+        'Kraj': top['names'],
+        'Suma': top['totals'],
+        'Średnia': top['averages']
+    })
+    st.dataframe(
+        top_df,
+        use_container_width=True,
+        column_config={
+            col: st.column_config.NumberColumn(format="localized")
+            for col in ('Suma', 'Średnia')
+        }
+    )
+
+    chart_viz = st.session_state.chart_visualizer
+    col_top, col_pie = st.columns(2)
+    with col_top:
+        st.plotly_chart(
+            chart_viz.create_top_n_chart(countries.tolist(), totals, 5, "Pojazdy zutylizowane"),
+            use_container_width=True
+        )
+    with col_pie:
+        st.plotly_chart(
+            chart_viz.create_pie_chart(countries.tolist(), totals, "Pojazdy zutylizowane"),
+            use_container_width=True
+        )
+
+
+@st.fragment
 def show_transport_tab():
     data_manager = st.session_state.data_manager
     
@@ -311,19 +496,12 @@ def show_transport_tab():
         
         view_mode = st.radio("Widok mapy:", ["Europa", "Polska"], key="tran_view")
         
-        viz_options = ["Tabela regionów"]
-        if HAS_MAPS:
-            viz_options.insert(0, "Mapa interaktywna")
-            
-        viz_type = st.radio("Typ wizualizacji:", viz_options)
+        viz_type = st.radio("Typ wizualizacji:", VIZ_OPTIONS_TRAN)
         
         st.subheader("Filtry")
         
-        countries = sorted(set(r.country_code for r in data_manager.tran_data))
-        selected_country = st.selectbox("Kraj:", ["Wszystkie"] + countries)
-        
-        nuts_levels = sorted(set(r.nuts_level for r in data_manager.tran_data))
-        selected_nuts = st.selectbox("Poziom NUTS:", ["Wszystkie"] + nuts_levels)
+        selected_country = st.selectbox("Kraj:", ["Wszystkie"] + data_manager.tran_country_codes)
+        selected_nuts = st.selectbox("Poziom NUTS:", ["Wszystkie"] + data_manager.tran_nuts_levels)
         
         filters = {}
         if selected_country != "Wszystkie":
@@ -333,7 +511,6 @@ def show_transport_tab():
         
         if filters != data_manager.data_filter:
             data_manager.apply_filter(filters)
-            st.rerun()
     
     with col2:
         if viz_type == "Mapa interaktywna" and HAS_MAPS:
@@ -347,13 +524,15 @@ def show_transport_map(view_mode):
         st.subheader("Mapa regionalna - Pojazdy elektryczne")
         
         data_manager = st.session_state.data_manager
-        map_visualizer = MapVisualizer('transport')
-        
+        map_data = data_manager.get_filtered_tran_data()
+
         with st.spinner("Generowanie mapy regionów..."):
-            folium_map = map_visualizer.create_map(
-                data_manager.get_filtered_tran_data(),
+            folium_map = _build_map(
+                'transport',
+                view_mode,
                 data_manager.year_range,
-                view_mode
+                _map_signature(map_data),
+                map_data
             )
         
         st_folium.st_folium(folium_map, width=800, height=500)
@@ -367,37 +546,40 @@ def show_transport_table():
     st.subheader("Dane regionalne - Pojazdy elektryczne")
     
     data_manager = st.session_state.data_manager
-    processor = DataProcessor(RegionAggregationStrategy())
-    result = processor.process_data(
-        data_manager.get_filtered_tran_data(),
-        data_manager.year_range
-    )
-    
+    result = _process_tran(data_manager.year_range, _tran_filter_key(data_manager))
+
     if result['regions']:
-        region_data = list(zip(
-            result['regions'], 
-            result['totals'], 
-            result['country_codes'],
-            result['nuts_levels']
-        ))
-        region_data.sort(key=lambda x: x[1], reverse=True)
-        top_regions = region_data[:20]
-        
-        display_data = []
-        for i, (name, total, country_code, nuts_level) in enumerate(top_regions):
-            display_data.append({
-                'Lp.': i + 1,
-                'Region': name,
-                'Kraj': country_code,
-                'NUTS': f"Level {nuts_level}",
-                'Suma': f"{total:,.0f}"
-            })
-        
-        st.dataframe(display_data, use_container_width=True)
+        df = pd.DataFrame({
+            'Region': result['regions'],
+            'Kraj': result['country_codes'],
+            'NUTS': result['nuts_levels'],
+            'Suma': result['totals']
+        })
+        df = df.nlargest(20, 'Suma').reset_index(drop=True)
+        df['NUTS'] = 'Level ' + df['NUTS'].astype(str)
+        df.insert(0, 'Lp.', np.arange(1, len(df) + 1))
+
+        st.dataframe(
+            df,
+            column_config={
+                'Suma': st.column_config.NumberColumn(format="localized")
+            },
+            use_container_width=True
+        )
+
+        country_code = data_manager.data_filter.get('country_code')
+        if country_code:
+            fig = st.session_state.chart_visualizer.create_regional_breakdown_chart(
+                data_manager.tran_data,
+                data_manager.year_range[1],
+                country_code
+            )
+            st.plotly_chart(fig, use_container_width=True)
     else:
         st.info("Brak danych dla wybranych filtrów")
 
 
+@st.fragment
 def show_analysis_tab():
     st.header("Analiza i porównania")
     
@@ -411,9 +593,8 @@ def show_analysis_tab():
     )
     
     if "zutylizowane" in data_source and data_manager.env_data:
-        available_items = [c.country_name for c in data_manager.env_data 
-                          if not any(skip in c.country_name.lower() 
-                                   for skip in ['european union', 'euro area'])]
+        available_items = [c.country_name for c in data_manager.env_data
+                          if not _SKIP_RE.search(c.country_name)]
     elif "elektryczne" in data_source and data_manager.tran_data:
         available_items = []
         seen = set()
@@ -436,8 +617,9 @@ def show_analysis_tab():
     )
     
     if search_term:
-        filtered_items = [item for item in available_items 
-                        if search_term.lower() in item.lower()]
+        items_arr, lowered_arr = _search_index(tuple(available_items))
+        mask = np.char.find(lowered_arr, search_term.lower()) >= 0
+        filtered_items = items_arr[mask].tolist()
     else:
         filtered_items = available_items
     
@@ -451,25 +633,101 @@ def show_analysis_tab():
     )
     
     if selected_items:
-        if st.button("Wygeneruj wykres słupkowy", type="primary"):
-            generate_bar_chart(data_source, selected_items)
+        col_bar, col_line = st.columns(2)
+        with col_bar:
+            if st.button("Wygeneruj wykres słupkowy", type="primary"):
+                generate_bar_chart(data_source, selected_items)
+        with col_line:
+            if st.button("Wygeneruj wykres liniowy"):
+                generate_line_chart(data_source, selected_items)
         
         st.subheader("Export")
         if st.button("Eksportuj wykres do PDF"):
             export_chart_pdf(data_source, selected_items)
+        show_pdf_export_status()
     else:
         st.info("Wybierz kraje/regiony z listy aby wygenerować wykres")
 
 
-def generate_bar_chart(data_source, selected_items):
+def _analysis_result(data_source, selected_items):
     data_manager = st.session_state.data_manager
-    chart_viz = st.session_state.chart_visualizer
     
+    if "zutylizowane" in data_source:
+        all_data = data_manager.env_data
+        filtered_data = [c for c in all_data if c.country_name in selected_items]
+        processor_key = 'country'
+        chart_data_source = "Pojazdy zutylizowane"
+    else:
+        all_data = data_manager.tran_data
+        selected_region_names = []
+        for item in selected_items:
+            if " (" in item:
+                region_name = item.split(" (")[0]
+                selected_region_names.append(region_name)
+            else:
+                selected_region_names.append(item)
+        
+        filtered_data = [r for r in all_data if r.region_name in selected_region_names]
+        processor_key = 'region'
+        chart_data_source = "Pojazdy elektryczne"
+    
+    if not filtered_data:
+        return None, chart_data_source
+    
+    processor = st.session_state.processors[processor_key]
+    return processor.process_data(filtered_data, data_manager.year_range), chart_data_source
+
+
+def generate_bar_chart(data_source, selected_items):
+    try:
+        result, chart_data_source = _analysis_result(data_source, selected_items)
+        
+        if result is None:
+            st.error("Nie znaleziono danych dla wybranych elementów")
+            return
+        
+        fig = _bar_fig(_result_signature(result), chart_data_source, result)
+        st.plotly_chart(fig, use_container_width=True, key=f"analysis_chart_{len(selected_items)}")
+        
+        st.success("Wykres wygenerowany!")
+        
+    except Exception as e:
+        st.error(f"Błąd generowania wykresu: {str(e)}")
+
+
+def generate_line_chart(data_source, selected_items):
+    try:
+        result, chart_data_source = _analysis_result(data_source, selected_items)
+        
+        if result is None:
+            st.error("Nie znaleziono danych dla wybranych elementów")
+            return
+        
+        fig = _line_fig(_result_signature(result), chart_data_source, result)
+        st.plotly_chart(fig, use_container_width=True, key=f"analysis_line_{len(selected_items)}")
+        
+        st.success("Wykres wygenerowany!")
+        
+    except Exception as e:
+        st.error(f"Błąd generowania wykresu: {str(e)}")
+
+
+def export_chart_pdf(data_source, selected_items):
     try:
+        data_manager = st.session_state.data_manager
+        pdf_exporter = st.session_state.pdf_exporter
+
+        cache_key = (data_source, tuple(selected_items), data_manager.year_range)
+        pdf_cache = st.session_state.setdefault('pdf_cache', {})
+        cached_path = pdf_cache.get(cache_key)
+        if cached_path and os.path.exists(cached_path):
+            st.session_state.pdf_path = cached_path
+            return
+
         if "zutylizowane" in data_source:
             all_data = data_manager.env_data
             filtered_data = [c for c in all_data if c.country_name in selected_items]
-            strategy = CountryAggregationStrategy()
+            processor_key = 'country'
             chart_data_source = "Pojazdy zutylizowane"
         else:
             all_data = data_manager.tran_data
@@ -480,84 +738,69 @@ def generate_bar_chart(data_source, selected_items):
                     selected_region_names.append(region_name)
                 else:
                     selected_region_names.append(item)
-            
+
             filtered_data = [r for r in all_data if r.region_name in selected_region_names]
-            strategy = RegionAggregationStrategy()
+            processor_key = 'region'
             chart_data_source = "Pojazdy elektryczne"
-        
+
         if not filtered_data:
             st.error("Nie znaleziono danych dla wybranych elementów")
             return
-        
-        processor = DataProcessor(strategy)
+
+        processor = st.session_state.processors[processor_key]
         result = processor.process_data(filtered_data, data_manager.year_range)
-        
-        fig = chart_viz.create_bar_chart(result, chart_data_source)
-        st.plotly_chart(fig, use_container_width=True, key=f"analysis_chart_{len(selected_items)}")
-        
-        st.success("Wykres wygenerowany!")
-        
-    except Exception as e:
-        st.error(f"Błąd generowania wykresu: {str(e)}")
 
+        fig = _bar_fig(_result_signature(result), chart_data_source, result)
+
+        st.session_state.pdf_cache_key = cache_key
+        st.session_state.pdf_future = _background_executor().submit(
+            pdf_exporter.export_chart,
+            figure=fig,
+            countries=selected_items,
+            data_source=chart_data_source,
+            year_range=data_manager.year_range,
+            additional_data=result
+        )
+        st.session_state.pop('pdf_path', None)
 
-def export_chart_pdf(data_source, selected_items):
-    try:
-        data_manager = st.session_state.data_manager
-        chart_viz = st.session_state.chart_visualizer
-        pdf_exporter = st.session_state.pdf_exporter
-        
-        with st.spinner("Generowanie PDF..."):
-            if "zutylizowane" in data_source:
-                all_data = data_manager.env_data
-                filtered_data = [c for c in all_data if c.country_name in selected_items]
-                strategy = CountryAggregationStrategy()
-                chart_data_source = "Pojazdy zutylizowane"
-            else:
-                all_data = data_manager.tran_data
-                selected_region_names = []
-                for item in selected_items:
-                    if " (" in item:
-                        region_name = item.split(" (")[0]
-                        selected_region_names.append(region_name)
-                    else:
-                        selected_region_names.append(item)
-                
-                filtered_data = [r for r in all_data if r.region_name in selected_region_names]
-                strategy = RegionAggregationStrategy()
-                chart_data_source = "Pojazdy elektryczne"
-            
-            if not filtered_data:
-                st.error("Nie znaleziono danych dla wybranych elementów")
-                return
-            
-            processor = DataProcessor(strategy)
-            result = processor.process_data(filtered_data, data_manager.year_range)
-            
-            fig = chart_viz.create_bar_chart(result, chart_data_source)
-            
-            pdf_path = pdf_exporter.export_chart(
-                figure=fig,
-                countries=selected_items[:5],
-                data_source=chart_data_source,
-                year_range=data_manager.year_range,
-                additional_data=result
-            )
-            
-            st.success("Raport PDF wygenerowany!")
-            
-            with open(pdf_path, "rb") as pdf_file:
-                st.download_button(
-                    "Pobierz PDF",
-                    data=pdf_file.read(),
-                    file_name=os.path.basename(pdf_path),
-                    mime="application/pdf",
-                    key="download_minimal_pdf"
-                )
-                
     except Exception as e:
         st.error(f"Błąd eksportu: {str(e)}")
 
 
+def show_pdf_export_status():
+    future = st.session_state.get('pdf_future')
+
+    if future is not None:
+        if not future.done():
+            st.info("Generowanie PDF w toku...")
+            if st.button("Odśwież status", key="pdf_status_refresh"):
+                st.rerun()
+            return
+
+        st.session_state.pop('pdf_future')
+        try:
+            st.session_state.pdf_path = future.result()
+        except Exception as e:
+            st.error(f"Błąd eksportu: {str(e)}")
+            return
+
+        cache_key = st.session_state.pop('pdf_cache_key', None)
+        if cache_key is not None:
+            st.session_state.setdefault('pdf_cache', {})[cache_key] = st.session_state.pdf_path
+
+    pdf_path = st.session_state.get('pdf_path')
+    if pdf_path and os.path.exists(pdf_path):
+        st.success("Raport PDF wygenerowany!")
+
+        with open(pdf_path, "rb") as pdf_file:
+            st.download_button(
+                "Pobierz PDF",
+                data=pdf_file.read(),
+                file_name=os.path.basename(pdf_path),
+                mime="application/pdf",
+                key="download_minimal_pdf"
+            )
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,36 @@
+import numpy as np
+
+try:
+    from numba import njit, prange
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+
+def _aggregate_rows_numpy(arr: np.ndarray):
+    totals = arr.sum(axis=1)
+    counts = (arr > 0).sum(axis=1).astype(np.int64)
+    return totals, counts
+
+
+if HAS_NUMBA:
+    @njit(parallel=True, cache=True)
+    def _aggregate_rows_jit(arr):
+        n, m = arr.shape
+        totals = np.zeros(n, dtype=np.float64)
+        counts = np.zeros(n, dtype=np.int64)
+        for i in prange(n):
+            total = 0.0
+            count = 0
+            for j in range(m):
+                value = arr[i, j]
+                total += value
+                count += value > 0
+            totals[i] = total
+            counts[i] = count
+        return totals, counts
+
+    def aggregate_rows(arr: np.ndarray):
+        return _aggregate_rows_jit(np.ascontiguousarray(arr))
+else:
+    aggregate_rows = _aggregate_rows_numpy
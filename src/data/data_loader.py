@@ -1,77 +1,168 @@
-import pandas as pd
+import os
 import logging
+import openpyxl
 from abc import ABC, abstractmethod
-from typing import List, Union
+from typing import BinaryIO, Iterable, List, Optional, Union
 from .models import CountryData, RegionData
 
+Source = Union[str, BinaryIO]
+
+
+_STRIP = str.maketrans('', '', ', \u00a0')
+
+# Environmental sheets treat zeros as missing; transport sheets keep them.
+_ENV_MIN_VALUE = 1e-9
+_TRAN_MIN_VALUE = 0.0
+
+
+def _clean_string_value(cell_value, blank_marker: str) -> Optional[float]:
+    try:
+        value_str = str(cell_value).translate(_STRIP)
+        if value_str and value_str != blank_marker:
+            return float(value_str)
+    except (ValueError, TypeError):
+        pass
+    return None
+
+
+_COUNTRY_CODES = {
+    'Poland': 'PL',
+    'Germany': 'DE',
+    'France': 'FR',
+    'Spain': 'ES',
+    'Italy': 'IT',
+    'Belgium': 'BE',
+    'Netherlands': 'NL',
+    'Austria': 'AT',
+    'Denmark': 'DK',
+    'Sweden': 'SE',
+    'Finland': 'FI',
+    'Norway': 'NO',
+    'Czech Republic': 'CZ',
+    'Czechia': 'CZ',
+    'Slovakia': 'SK',
+    'Hungary': 'HU',
+    'Slovenia': 'SI',
+    'Croatia': 'HR',
+    'Romania': 'RO',
+    'Bulgaria': 'BG',
+    'Lithuania': 'LT',
+    'Latvia': 'LV',
+    'Estonia': 'EE',
+    'Portugal': 'PT',
+    'Greece': 'GR',
+    'Ireland': 'IE'
+}
+
+
+def _collect_row_values(row: tuple, year_cols: List[tuple], blank_marker: str,
+                        minimum: float) -> dict:
+    data_by_year = {}
+    row_len = len(row)
+    for year, value_col_idx in year_cols:
+        if value_col_idx >= row_len:
+            break
+
+        cell_value = row[value_col_idx]
+
+        if cell_value is None:
+            continue
+
+        if type(cell_value) in (int, float):
+            if cell_value >= minimum:
+                data_by_year[year] = float(cell_value)
+            continue
+
+        value = _clean_string_value(cell_value, blank_marker)
+        if value is not None and value >= minimum:
+            data_by_year[year] = value
+    return data_by_year
+
+
+def _parse_header_years(header: tuple, value_start: int) -> List[int]:
+    years = []
+    for cell_value in header[value_start::2]:
+        if cell_value is None:
+            continue
+        try:
+            year = int(str(cell_value).strip())
+        except (ValueError, TypeError):
+            continue
+        if 2000 <= year <= 2030:
+            years.append(year)
+    return years
+
+
+def stat_file(file_path: str) -> Optional[os.stat_result]:
+    try:
+        return os.stat(file_path)
+    except (FileNotFoundError, OSError):
+        return None
+
 
 class DataLoader(ABC):
-    
+
     @abstractmethod
-    def load(self, file_path: str) -> List[Union[CountryData, RegionData]]:
+    def load(self, source: Source) -> List[Union[CountryData, RegionData]]:
         pass
-    
+
     @abstractmethod
-    def _parse_data(self, df: pd.DataFrame) -> List[Union[CountryData, RegionData]]:
+    def _parse_data(self, rows: Iterable[tuple]) -> List[Union[CountryData, RegionData]]:
         pass
 
+    def _load_streaming(self, source: Source) -> List[Union[CountryData, RegionData]]:
+        wb = openpyxl.load_workbook(source, read_only=True, data_only=True)
+        try:
+            ws = wb['Sheet 1']
+            # Eurostat exports carry a stale dimension tag; recompute it so
+            # read-only iteration sees the whole sheet.
+            ws.reset_dimensions()
+            return self._parse_data(ws.iter_rows(values_only=True))
+        finally:
+            wb.close()
+
 
 class EnvironmentalDataLoader(DataLoader):
-    
-    def load(self, file_path: str) -> List[CountryData]:
-        try:
-            df = pd.read_excel(file_path, sheet_name='Sheet 1', header=None)
-            countries = self._parse_data(df)
-            return countries
-        
-        except FileNotFoundError:
+
+    def load(self, source: Source) -> List[CountryData]:
+        if isinstance(source, str) and stat_file(source) is None:
             return []
+
+        try:
+            return self._load_streaming(source)
+
         except Exception as e:
             logging.error(f"Error loading environmental data: {e}")
             return []
-    
-    def _parse_data(self, df: pd.DataFrame) -> List[CountryData]:
+
+    def _parse_data(self, rows: Iterable[tuple]) -> List[CountryData]:
         countries = []
-        
+
         header_row = 8
         data_start_row = 10
-        
-        years = []
-        for col_idx in range(1, len(df.columns), 2):
-            cell_value = df.iloc[header_row, col_idx]
-            if pd.notna(cell_value):
-                try:
-                    year = int(str(cell_value).strip())
-                    if 2000 <= year <= 2030:
-                        years.append(year)
-                except (ValueError, TypeError):
-                    continue
-        
-        for row_idx in range(data_start_row, len(df)):
-            country_name = df.iloc[row_idx, 0]
-            
-            if pd.isna(country_name) or not str(country_name).strip():
+
+        year_cols = []
+        for row_idx, row in enumerate(rows):
+            if row_idx < data_start_row:
+                if row_idx == header_row:
+                    years = _parse_header_years(row, 1)
+                    year_cols = [(year, 1 + i * 2) for i, year in enumerate(years)]
                 continue
-                
-            country_name = str(country_name).strip()
-            
-            data_by_year = {}
-            for i, year in enumerate(years):
-                value_col_idx = 1 + (i * 2)
-                
-                if value_col_idx < len(df.columns):
-                    cell_value = df.iloc[row_idx, value_col_idx]
-                    
-                    if pd.notna(cell_value):
-                        try:
-                            value_str = str(cell_value).replace(',', '').replace(' ', '')
-                            if value_str and value_str != 'i':
-                                value = float(value_str)
-                                if value > 0:
-                                    data_by_year[year] = value
-                        except (ValueError, TypeError):
-                            continue
-            
+
+            country_name = row[0] if row else None
+
+            if country_name is None:
+                continue
+
+            if type(country_name) is not str:
+                country_name = str(country_name)
+            country_name = country_name.strip()
+
+            if not country_name:
+                continue
+
+            data_by_year = _collect_row_values(row, year_cols, 'i', _ENV_MIN_VALUE)
+
             if data_by_year:
                 country_code = self._generate_country_code(country_name)
                 country_data = CountryData(
@@ -81,104 +172,61 @@ class EnvironmentalDataLoader(DataLoader):
                     data_type='environmental'
                 )
                 countries.append(country_data)
-        
+
         return countries
-    
+
     def _generate_country_code(self, country_name: str) -> str:
-        country_codes = {
-            'Poland': 'PL',
-            'Germany': 'DE',
-            'France': 'FR', 
-            'Spain': 'ES',
-            'Italy': 'IT',
-            'Belgium': 'BE',
-            'Netherlands': 'NL',
-            'Austria': 'AT',
-            'Denmark': 'DK',
-            'Sweden': 'SE',
-            'Finland': 'FI',
-            'Norway': 'NO',
-            'Czech Republic': 'CZ',
-            'Czechia': 'CZ',
-            'Slovakia': 'SK',
-            'Hungary': 'HU',
-            'Slovenia': 'SI',
-            'Croatia': 'HR',
-            'Romania': 'RO',
-            'Bulgaria': 'BG',
-            'Lithuania': 'LT',
-            'Latvia': 'LV',
-            'Estonia': 'EE',
-            'Portugal': 'PT',
-            'Greece': 'GR',
-            'Ireland': 'IE'
-        }
-        
-        return country_codes.get(country_name, country_name[:2].upper())
+        return _COUNTRY_CODES.get(country_name, country_name[:2].upper())
 
 
 class TransportDataLoader(DataLoader):
-    
-    def load(self, file_path: str) -> List[RegionData]:
-        try:
-            df = pd.read_excel(file_path, sheet_name='Sheet 1', header=None)
-            regions = self._parse_data(df)
-            return regions
-        
-        except FileNotFoundError:
+
+    def load(self, source: Source) -> List[RegionData]:
+        if isinstance(source, str) and stat_file(source) is None:
             return []
+
+        try:
+            return self._load_streaming(source)
+
         except Exception as e:
             logging.error(f"Error loading transport data: {e}")
             return []
-    
-    def _parse_data(self, df: pd.DataFrame) -> List[RegionData]:
+
+    def _parse_data(self, rows: Iterable[tuple]) -> List[RegionData]:
         regions = []
-        
+
         header_row = 8
         data_start_row = 10
-        
-        years = []
-        for col_idx in range(2, len(df.columns), 2):
-            cell_value = df.iloc[header_row, col_idx]
-            if pd.notna(cell_value):
-                try:
-                    year = int(str(cell_value).strip())
-                    if 2000 <= year <= 2030:
-                        years.append(year)
-                except (ValueError, TypeError):
-                    continue
-        
-        for row_idx in range(data_start_row, len(df)):
-            region_code = df.iloc[row_idx, 0]
-            region_name = df.iloc[row_idx, 1]
-            
-            if pd.isna(region_name) or not str(region_name).strip():
+
+        year_cols = []
+        for row_idx, row in enumerate(rows):
+            if row_idx < data_start_row:
+                if row_idx == header_row:
+                    years = _parse_header_years(row, 2)
+                    year_cols = [(year, 2 + i * 2) for i, year in enumerate(years)]
                 continue
-                
-            region_code = str(region_code).strip() if pd.notna(region_code) else 'UNKNOWN'
-            region_name = str(region_name).strip()
-            
-            data_by_year = {}
-            for i, year in enumerate(years):
-                value_col_idx = 2 + (i * 2)
-                
-                if value_col_idx < len(df.columns):
-                    cell_value = df.iloc[row_idx, value_col_idx]
-                    
-                    if pd.notna(cell_value):
-                        try:
-                            value_str = str(cell_value).replace(',', '').replace(' ', '')
-                            if value_str and value_str != ':':
-                                value = float(value_str)
-                                if value >= 0:
-                                    data_by_year[year] = value
-                        except (ValueError, TypeError):
-                            continue
-            
+
+            region_code = row[0] if row else None
+            region_name = row[1] if len(row) > 1 else None
+
+            if region_name is None:
+                continue
+
+            if type(region_name) is not str:
+                region_name = str(region_name)
+            region_name = region_name.strip()
+
+            if not region_name:
+                continue
+
+            region_code = str(region_code).strip() if region_code is not None else 'UNKNOWN'
+
+            data_by_year = _collect_row_values(row, year_cols, ':', _TRAN_MIN_VALUE)
+
             if data_by_year:
                 nuts_level = self._get_nuts_level(region_code)
                 country_code = self._extract_country_code(region_code)
-                
+
                 region_data = RegionData(
                     region_code=region_code,
                     region_name=region_name,
@@ -187,13 +235,13 @@ class TransportDataLoader(DataLoader):
                     data_by_year=data_by_year
                 )
                 regions.append(region_data)
-        
+
         return regions
-    
+
     def _get_nuts_level(self, region_code: str) -> int:
         if not region_code or region_code == 'UNKNOWN':
             return 0
-            
+
         code_len = len(region_code)
         if code_len == 2:
             return 0
@@ -203,7 +251,7 @@ class TransportDataLoader(DataLoader):
             return 2
         else:
             return 3
-    
+
     def _extract_country_code(self, region_code: str) -> str:
         if not region_code or len(region_code) < 2:
             return 'XX'
@@ -211,18 +259,18 @@ class TransportDataLoader(DataLoader):
 
 
 class DataLoaderFactory:
-    
+
     @staticmethod
     def create_loader(data_type: str) -> DataLoader:
         data_type = data_type.lower().strip()
-        
+
         if data_type in ['environmental', 'env', 'recycling', 'środowiskowy']:
             return EnvironmentalDataLoader()
         elif data_type in ['transport', 'tran', 'electric', 'transportowy']:
             return TransportDataLoader()
         else:
             raise ValueError(f"Nieznany typ danych: {data_type}")
-    
+
     @staticmethod
     def get_available_types() -> List[str]:
         return ['environmental', 'transport']
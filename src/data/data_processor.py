@@ -1,86 +1,201 @@
-from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Union
-from .models import CountryData, RegionData
+from functools import lru_cache
+from typing import List, Dict, Any, Protocol, Union
+import numpy as np
+import pandas as pd
+from .models import CountryData, RegionData, MIN_YEAR
+from ._kernels import aggregate_rows
 
 
-class DataProcessingStrategy(ABC):
-    
-    @abstractmethod
-    def process(self, data: List[Union[CountryData, RegionData]], 
+__all__ = [
+    'DataProcessingStrategy',
+    'CountryAggregationStrategy',
+    'RegionAggregationStrategy',
+    'TopNStrategy',
+    'DataProcessor',
+    'DataAggregator'
+]
+
+
+@lru_cache(maxsize=32)
+def _year_axis(start_year: int, end_year: int) -> tuple:
+    return tuple(range(start_year, end_year + 1))
+
+
+def _aggregate(data: List[Union[CountryData, RegionData]], start_year: int, end_year: int):
+    arr = np.array(
+        [item.get_values_for_range(start_year, end_year) for item in data],
+        dtype=np.float64
+    )
+    totals, counts = aggregate_rows(arr)
+    return arr, totals, counts
+
+
+class DataProcessingStrategy(Protocol):
+
+    def process(self, data: List[Union[CountryData, RegionData]],
                 year_range: tuple, **kwargs) -> Dict[str, Any]:
-        pass
+        ...
 
 
-class CountryAggregationStrategy(DataProcessingStrategy):
+class CountryAggregationStrategy:
     
-    def process(self, data: List[CountryData], year_range: tuple, 
+    def process(self, data: List[CountryData], year_range: tuple,
                 **kwargs) -> Dict[str, Any]:
         start_year, end_year = year_range
+        years = _year_axis(start_year, end_year)
         result = {
             'countries': [],
             'values': [],
-            'years': list(range(start_year, end_year + 1)),
+            'years': years,
             'totals': [],
             'averages': []
         }
-        
-        for country in data:
-            country_values = []
-            for year in result['years']:
-                value = country.get_value_for_year(year)
-                country_values.append(value if value is not None else 0)
-            
-            if any(v > 0 for v in country_values):
-                result['countries'].append(country.country_name)
-                result['values'].append(country_values)
-                result['totals'].append(sum(country_values))
-                result['averages'].append(sum(country_values) / len([v for v in country_values if v > 0]) 
-                                        if any(v > 0 for v in country_values) else 0)
-        
+
+        if not data:
+            return result
+
+        arr, totals, counts = _aggregate(data, start_year, end_year)
+        keep = np.flatnonzero(counts > 0)
+
+        result['countries'] = [data[i].country_name for i in keep]
+        result['values'] = arr[keep].tolist()
+        result['totals'] = totals[keep].tolist()
+        result['averages'] = (totals[keep] / counts[keep]).tolist()
         return result
 
 
-class RegionAggregationStrategy(DataProcessingStrategy):
+class RegionAggregationStrategy:
     
     def process(self, data: List[RegionData], year_range: tuple,
                 country_filter: str = None, nuts_level: int = None, **kwargs) -> Dict[str, Any]:
         start_year, end_year = year_range
         filtered_data = data
-        
-        if country_filter:
-            filtered_data = [r for r in filtered_data if r.country_code == country_filter.upper()]
-        
-        if nuts_level is not None:
-            filtered_data = [r for r in filtered_data if r.nuts_level == nuts_level]
+
+        if data and (country_filter or nuts_level is not None):
+            mask = np.ones(len(data), dtype=bool)
+
+            if country_filter:
+                codes = np.array([r.country_code for r in data], dtype=object)
+                mask &= codes == country_filter.upper()
+
+            if nuts_level is not None:
+                levels = np.array([r.nuts_level for r in data], dtype=np.int8)
+                mask &= levels == nuts_level
+
+            filtered_data = [data[i] for i in np.flatnonzero(mask)]
         
         result = {
             'regions': [],
             'values': [],
-            'years': list(range(start_year, end_year + 1)),
+            'years': _year_axis(start_year, end_year),
             'country_codes': [],
             'nuts_levels': [],
             'totals': [],
             'averages': []
         }
-        
-        for region in filtered_data:
-            region_values = []
-            for year in result['years']:
-                value = region.get_value_for_year(year)
-                region_values.append(value if value is not None else 0)
-            
-            if any(v > 0 for v in region_values):
-                result['regions'].append(region.region_name)
-                result['values'].append(region_values)
-                result['country_codes'].append(region.country_code)
-                result['nuts_levels'].append(region.nuts_level)
-                result['totals'].append(sum(region_values))
-                result['averages'].append(sum(region_values) / len([v for v in region_values if v > 0]) 
-                                        if any(v > 0 for v in region_values) else 0)
-        
+
+        if not filtered_data:
+            return result
+
+        arr, totals, counts = _aggregate(filtered_data, start_year, end_year)
+        keep = np.flatnonzero(counts > 0)
+
+        result['regions'] = [filtered_data[i].region_name for i in keep]
+        result['values'] = arr[keep].tolist()
+        result['country_codes'] = [filtered_data[i].country_code for i in keep]
+        result['nuts_levels'] = [filtered_data[i].nuts_level for i in keep]
+        result['totals'] = totals[keep].tolist()
+        result['averages'] = (totals[keep] / counts[keep]).tolist()
         return result
 
 
+class TopNStrategy:
+    
+    def __init__(self, n: int = 10, sort_by: str = 'total'):
+        self.n = n
+        self.sort_by = sort_by
+    
+    def process(self, data: List[Union[CountryData, RegionData]], year_range: tuple,
+                **kwargs) -> Dict[str, Any]:
+        start_year, end_year = year_range
+        years = _year_axis(start_year, end_year)
+
+        if not data:
+            return {'names': [], 'totals': [], 'averages': [], 'years': years}
+
+        _, totals, counts = _aggregate(data, start_year, end_year)
+        keep = np.flatnonzero(counts > 0)
+        totals = totals[keep]
+        averages = totals / counts[keep]
+
+        metric = totals if self.sort_by == 'total' else averages
+        n = min(self.n, len(metric))
+
+        if n:
+            top_idx = np.argpartition(metric, len(metric) - n)[-n:]
+            top_idx = top_idx[np.argsort(metric[top_idx])[::-1]]
+        else:
+            top_idx = np.empty(0, dtype=np.intp)
+
+        return {
+            'names': [data[keep[i]].display_name for i in top_idx],
+            'totals': totals[top_idx].tolist(),
+            'averages': averages[top_idx].tolist(),
+            'years': years
+        }
+
+
+class DataAggregator:
+
+    @staticmethod
+    def aggregate_by_country(data: List[RegionData], year_range: tuple) -> Dict[str, Any]:
+        start_year, end_year = year_range
+        years = list(_year_axis(start_year, end_year))
+
+        if not data:
+            return {'countries': [], 'values': [], 'years': years, 'regions_count': {}}
+
+        values = np.vstack([r.get_values_for_range(start_year, end_year) for r in data])
+        frame = pd.DataFrame(values, columns=years)
+        frame['country_code'] = [r.country_code for r in data]
+
+        grouped = frame.groupby('country_code', sort=True)
+        totals = grouped[years].sum()
+        counts = grouped.size()
+
+        return {
+            'countries': totals.index.tolist(),
+            'values': totals.to_numpy().tolist(),
+            'years': years,
+            'regions_count': counts.to_dict()
+        }
+
+    @staticmethod
+    def get_time_series_data(data: List[Union[CountryData, RegionData]],
+                             year_range: tuple) -> pd.DataFrame:
+        start_year, end_year = year_range
+        years = np.asarray(_year_axis(start_year, end_year))
+
+        if not data:
+            return pd.DataFrame(columns=['name', 'year', 'value', 'type'])
+
+        raw = np.vstack(
+            [item.data_by_year_arr[start_year - MIN_YEAR:end_year - MIN_YEAR + 1] for item in data]
+        ).ravel()
+        names = np.array([item.display_name for item in data], dtype=object)
+        types = np.array([item.TYPE for item in data], dtype=object)
+
+        mask = ~np.isnan(raw) & (raw > 0)
+        n_years = len(years)
+
+        return pd.DataFrame({
+            'name': np.repeat(names, n_years)[mask],
+            'year': np.tile(years, len(data))[mask],
+            'value': raw[mask].astype(np.float64),
+            'type': np.repeat(types, n_years)[mask]
+        })
+
+
 class DataProcessor:
     
     def __init__(self, strategy: DataProcessingStrategy):
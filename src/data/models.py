@@ -1,23 +1,53 @@
-from dataclasses import dataclass
-from typing import Dict, List, Optional
+from dataclasses import dataclass, field
+from typing import ClassVar, Dict, List, Optional
+import numpy as np
 
+MIN_YEAR = 2000
+MAX_YEAR = 2030
+_N_YEARS = MAX_YEAR - MIN_YEAR + 1
 
-@dataclass
+
+def _build_value_array(data_by_year: Dict[int, float]) -> np.ndarray:
+    arr = np.full(_N_YEARS, np.nan, dtype=np.float32)
+    for year, value in data_by_year.items():
+        if MIN_YEAR <= year <= MAX_YEAR:
+            arr[year - MIN_YEAR] = value
+    return arr
+
+
+@dataclass(slots=True, frozen=True)
 class CountryData:
     country_code: str
     country_name: str
     data_by_year: Dict[int, float]
     data_type: str = 'environmental'
-    
+    data_by_year_arr: np.ndarray = field(default=None, repr=False, compare=False)
+
+    TYPE: ClassVar[str] = 'country'
+
+    def __post_init__(self):
+        object.__setattr__(self, 'data_by_year_arr', _build_value_array(self.data_by_year))
+
+    @property
+    def display_name(self) -> str:
+        return self.country_name
+
     def get_value_for_year(self, year: int) -> Optional[float]:
-        return self.data_by_year.get(year)
-    
+        if not MIN_YEAR <= year <= MAX_YEAR:
+            return None
+        value = self.data_by_year_arr[year - MIN_YEAR]
+        return None if np.isnan(value) else float(value)
+
+    def get_values_for_range(self, start_year: int, end_year: int) -> np.ndarray:
+        values = self.data_by_year_arr[start_year - MIN_YEAR:end_year - MIN_YEAR + 1]
+        return np.nan_to_num(values, nan=0.0)
+
     def get_year_range(self) -> tuple:
         if not self.data_by_year:
             return (None, None)
         years = list(self.data_by_year.keys())
         return (min(years), max(years))
-    
+
     def get_total_for_period(self, start_year: int, end_year: int) -> float:
         total = 0.0
         for year in range(start_year, end_year + 1):
@@ -27,20 +57,37 @@ class CountryData:
         return total
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class RegionData:
     region_code: str
     region_name: str
     country_code: str
     nuts_level: int
     data_by_year: Dict[int, float]
-    
+    data_by_year_arr: np.ndarray = field(default=None, repr=False, compare=False)
+
+    TYPE: ClassVar[str] = 'region'
+
+    def __post_init__(self):
+        object.__setattr__(self, 'data_by_year_arr', _build_value_array(self.data_by_year))
+
+    @property
+    def display_name(self) -> str:
+        return self.region_name
+
     def get_value_for_year(self, year: int) -> Optional[float]:
-        return self.data_by_year.get(year)
-    
+        if not MIN_YEAR <= year <= MAX_YEAR:
+            return None
+        value = self.data_by_year_arr[year - MIN_YEAR]
+        return None if np.isnan(value) else float(value)
+
+    def get_values_for_range(self, start_year: int, end_year: int) -> np.ndarray:
+        values = self.data_by_year_arr[start_year - MIN_YEAR:end_year - MIN_YEAR + 1]
+        return np.nan_to_num(values, nan=0.0)
+
     def is_country_level(self) -> bool:
         return self.nuts_level == 0
-    
+
     def get_year_range(self) -> tuple:
         if not self.data_by_year:
             return (None, None)
@@ -1,24 +1,26 @@
-EXCEL_CONFIG = {
+from types import MappingProxyType
+
+EXCEL_CONFIG = MappingProxyType({
     'HEADER_ROW': 8,
     'DATA_START_ROW': 10
-}
+})
 
-MAP_CONFIG = {
-    'EUROPE_CENTER': [54.5, 15.2],
-    'POLAND_CENTER': [52.0, 19.5],
+MAP_CONFIG = MappingProxyType({
+    'EUROPE_CENTER': (54.5, 15.2),
+    'POLAND_CENTER': (52.0, 19.5),
     'EUROPE_ZOOM': 4,
     'POLAND_ZOOM': 7,
     'COLOR_SCALE': 'YlOrRd'
-}
+})
 
-CHART_CONFIG = {
+CHART_CONFIG = MappingProxyType({
     'WIDTH': 800,
     'HEIGHT': 600,
-    'COLORS': ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd'],
+    'COLORS': ('#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd'),
     'FONT_SIZE': 12
-}
+})
 
-COUNTRY_COORDINATES = {
+COUNTRY_COORDINATES = MappingProxyType({
     'poland': (52.0, 19.0),
     'germany': (51.0, 9.0),
     'france': (46.0, 2.0),
@@ -61,4 +63,17 @@ COUNTRY_COORDINATES = {
     'świętokrzyskie': (50.6, 20.6),
     'lubuskie': (52.0, 15.2),
     'opolskie': (50.5, 17.9)
-}
+})
+
+try:
+    from numba import types as _nb_types
+    from numba.typed import Dict as _NumbaDict
+
+    COUNTRY_COORDINATES_NB = _NumbaDict.empty(
+        key_type=_nb_types.unicode_type,
+        value_type=_nb_types.UniTuple(_nb_types.float64, 2)
+    )
+    for _name, _coords in COUNTRY_COORDINATES.items():
+        COUNTRY_COORDINATES_NB[_name] = _coords
+except ImportError:
+    COUNTRY_COORDINATES_NB = COUNTRY_COORDINATES
@@ -1,7 +1,17 @@
 from abc import ABC, abstractmethod
-from typing import List, Any, Dict
+from contextlib import contextmanager
+from itertools import compress
+from typing import List, Any, Dict, Optional
 import logging
-from data.models import CountryData, RegionData
+import threading
+import time
+import numpy as np
+import pandas as pd
+from ..data.models import CountryData, RegionData
+
+_log = logging.getLogger(__name__)
+
+DATA_YEARS = tuple(range(2013, 2023))
 
 
 class Observer(ABC):
@@ -14,22 +24,44 @@ class Observer(ABC):
 class Subject(ABC):
     
     def __init__(self):
-        self._observers: List[Observer] = []
+        self._observers: Dict[int, Observer] = {}
+        self._observer_snapshot: tuple = ()
+        self._batch_depth = 0
+        self._pending: Dict[str, Any] = {}
     
     def attach(self, observer: Observer):
-        if observer not in self._observers:
-            self._observers.append(observer)
+        if id(observer) not in self._observers:
+            self._observers[id(observer)] = observer
+            self._observer_snapshot = tuple(self._observers.values())
     
     def detach(self, observer: Observer):
-        if observer in self._observers:
-            self._observers.remove(observer)
+        if self._observers.pop(id(observer), None) is not None:
+            self._observer_snapshot = tuple(self._observers.values())
     
     def notify(self, event_type: str, data: Any = None):
-        for observer in self._observers:
+        if self._batch_depth > 0:
+            # Coalesce by event type, keeping the latest payload.
+            self._pending[event_type] = data
+            return
+        # Writers publish a fresh tuple, so reentrant attach/detach from
+        # an observer's update cannot break this iteration.
+        for observer in self._observer_snapshot:
             try:
                 observer.update(self, event_type, data)
-            except Exception as e:
-                logging.error(f"Error notifying observer: {e}")
+            except Exception:
+                _log.exception("Error notifying observer")
+
+    @contextmanager
+    def batch(self):
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0 and self._pending:
+                pending, self._pending = self._pending, {}
+                for event_type, data in pending.items():
+                    self.notify(event_type, data)
 
 
 class DataObserver(Observer):
@@ -39,67 +71,183 @@ class DataObserver(Observer):
         self.callback = callback
     
     def update(self, subject: Subject, event_type: str, data: Any):
-        logging.info(f"{self.name} received {event_type}")
+        if _log.isEnabledFor(logging.INFO):
+            _log.info("%s received %s", self.name, event_type)
         
         if self.callback:
             try:
                 self.callback(event_type, data)
-            except Exception as e:
-                logging.error(f"Error in callback: {e}")
+            except Exception:
+                _log.exception("Error in callback")
 
 
 class DataManager(Subject):
     
-    def __init__(self):
+    def __init__(self, debounce_interval: Optional[float] = None):
         super().__init__()
+        self._debounce_interval = debounce_interval
+        self._pending_events: Dict[str, Any] = {}
+        self._debounce_timer: Optional[threading.Timer] = None
+        self._debounce_lock = threading.Lock()
         self.env_data: List[CountryData] = []
         self.tran_data: List[RegionData] = []
+        self._env_df = pd.DataFrame(columns=['country_name', *DATA_YEARS])
+        self._tran_df = pd.DataFrame(columns=['region_name', 'country_code', 'nuts_level', *DATA_YEARS])
+        self.env_matrix = np.empty((0, len(DATA_YEARS)))
+        self.env_country_names = np.empty(0, dtype=object)
+        self.tran_matrix = np.empty((0, len(DATA_YEARS)))
+        self.tran_region_names = np.empty(0, dtype=object)
+        self._tran_cc_arr = np.empty(0, dtype=object)
+        self._tran_nuts_arr = np.empty(0, dtype=np.int8)
+        self.tran_country_codes: List[str] = []
+        self.tran_nuts_levels: List[int] = []
         self.year_range: tuple = (2018, 2022)
         self.selected_countries: List[str] = []
+        self._selected_countries_set = frozenset()
         self.data_filter: Dict[str, Any] = {}
+        self._country_code_filter: Optional[str] = None
+        self._filter_cache: Dict[str, list] = {}
+        self.data_version = 0
+        self._timestamp = time.monotonic_ns()
+
+    def notify(self, event_type: str, data: Any = None):
+        if self._debounce_interval is None:
+            super().notify(event_type, data)
+            return
+        with self._debounce_lock:
+            self._pending_events[event_type] = data
+            if self._debounce_timer is not None:
+                self._debounce_timer.cancel()
+            self._debounce_timer = threading.Timer(self._debounce_interval, self._flush_pending)
+            self._debounce_timer.daemon = True
+            self._debounce_timer.start()
+
+    def _flush_pending(self):
+        with self._debounce_lock:
+            pending, self._pending_events = self._pending_events, {}
+            self._debounce_timer = None
+        for event_type, data in pending.items():
+            super().notify(event_type, data)
+
+    def _update_timestamp(self):
+        self._timestamp = time.monotonic_ns()
+        self.data_version += 1
+        self._filter_cache.clear()
     
     def load_environmental_data(self, data: List[CountryData]):
         self.env_data = data
-        self.notify('env_data_loaded', {'count': len(data)})
+        self._update_timestamp()
+        values = np.array(
+            [c.get_values_for_range(DATA_YEARS[0], DATA_YEARS[-1]) for c in data],
+            dtype=np.float32
+        ).reshape(len(data), len(DATA_YEARS))
+        self._env_df = pd.DataFrame(values, columns=list(DATA_YEARS))
+        self._env_df.insert(0, 'country_name', [c.country_name for c in data])
+        self.env_matrix = values
+        self.env_country_names = self._env_df['country_name'].to_numpy()
+        if self._observers:
+            self.notify('env_data_loaded', {'count': len(data)})
     
     def load_transport_data(self, data: List[RegionData]):
         self.tran_data = data
-        countries = set(r.country_code for r in data)
-        self.notify('tran_data_loaded', {'count': len(data), 'countries': len(countries)})
+        self._update_timestamp()
+        values = np.array(
+            [r.get_values_for_range(DATA_YEARS[0], DATA_YEARS[-1]) for r in data],
+            dtype=np.float32
+        ).reshape(len(data), len(DATA_YEARS))
+        self._tran_df = pd.DataFrame(values, columns=list(DATA_YEARS))
+        self._tran_df.insert(0, 'region_name', [r.region_name for r in data])
+        self._tran_df.insert(1, 'country_code', [r.country_code for r in data])
+        self._tran_df.insert(2, 'nuts_level', np.array([r.nuts_level for r in data], dtype=np.int8))
+        self.tran_matrix = values
+        self.tran_region_names = self._tran_df['region_name'].to_numpy()
+        self._tran_cc_arr = self._tran_df['country_code'].to_numpy()
+        self._tran_nuts_arr = self._tran_df['nuts_level'].to_numpy()
+        self.tran_country_codes = sorted(self._tran_df['country_code'].unique().tolist())
+        self.tran_nuts_levels = sorted(self._tran_df['nuts_level'].unique().tolist())
+        if self._observers:
+            self.notify('tran_data_loaded', {'count': len(data),
+                                             'countries': self._tran_df['country_code'].nunique()})
     
     def set_year_range(self, year_range: tuple):
         old_range = self.year_range
         self.year_range = year_range
-        self.notify('year_range_changed', {'old_range': old_range, 'new_range': year_range})
+        if self._observers:
+            self.notify('year_range_changed', {'old_range': old_range, 'new_range': year_range})
     
     def set_selected_countries(self, countries: List[str]):
-        old_selection = self.selected_countries.copy()
+        old_selection = self.selected_countries
         self.selected_countries = countries
-        self.notify('countries_selected', {'old_selection': old_selection, 'new_selection': countries})
+        self._selected_countries_set = frozenset(countries)
+        self._update_timestamp()
+        if self._observers:
+            self.notify('countries_selected',
+                        {'old_selection': old_selection, 'new_selection': countries})
     
     def apply_filter(self, filter_criteria: Dict[str, Any]):
-        old_filter = self.data_filter.copy()
-        self.data_filter.update(filter_criteria)
-        self.notify('filter_applied', {'old_filter': old_filter, 'new_filter': self.data_filter})
+        old_filter = self.data_filter
+        self.data_filter = {**self.data_filter, **filter_criteria}
+        code = self.data_filter.get('country_code')
+        self._country_code_filter = code.upper() if code else None
+        self._update_timestamp()
+        if self._observers:
+            self.notify('filter_applied', {'old_filter': old_filter, 'new_filter': self.data_filter})
     
+    def env_window(self, year_range: tuple, names: Optional[List[str]] = None):
+        start_year, end_year = year_range
+        window = self.env_matrix[:, start_year - DATA_YEARS[0]:end_year - DATA_YEARS[0] + 1]
+        country_names = self.env_country_names
+
+        if names:
+            mask = np.isin(country_names, list(names))
+            window = window[mask]
+            country_names = country_names[mask]
+
+        totals = window.sum(axis=1)
+        counts = (window > 0).sum(axis=1)
+        averages = np.where(counts > 0, totals / np.maximum(counts, 1), 0.0)
+        return country_names, totals, averages
+
+    def tran_window(self, year_range: tuple, names: Optional[List[str]] = None):
+        start_year, end_year = year_range
+        window = self.tran_matrix[:, start_year - DATA_YEARS[0]:end_year - DATA_YEARS[0] + 1]
+        region_names = self.tran_region_names
+
+        if names:
+            mask = np.isin(region_names, list(names))
+            window = window[mask]
+            region_names = region_names[mask]
+
+        totals = window.sum(axis=1)
+        counts = (window > 0).sum(axis=1)
+        averages = np.where(counts > 0, totals / np.maximum(counts, 1), 0.0)
+        return region_names, totals, averages
+
     def get_filtered_env_data(self) -> List[CountryData]:
-        filtered_data = self.env_data
-        if self.selected_countries:
-            filtered_data = [c for c in filtered_data if c.country_name in self.selected_countries]
-        return filtered_data
+        if 'env' not in self._filter_cache:
+            filtered_data = self.env_data
+            if self._selected_countries_set:
+                filtered_data = [c for c in filtered_data
+                                 if c.country_name in self._selected_countries_set]
+            self._filter_cache['env'] = filtered_data
+        return self._filter_cache['env']
     
     def get_filtered_tran_data(self) -> List[RegionData]:
-        filtered_data = self.tran_data
-        
-        if 'country_code' in self.data_filter:
-            country_code = self.data_filter['country_code'].upper()
-            filtered_data = [r for r in filtered_data if r.country_code == country_code]
-        
-        if 'nuts_level' in self.data_filter:
-            nuts_level = self.data_filter['nuts_level']
-            filtered_data = [r for r in filtered_data if r.nuts_level == nuts_level]
-        
-        return filtered_data
+        if 'tran' not in self._filter_cache:
+            mask = None
+
+            if self._country_code_filter is not None:
+                mask = self._tran_cc_arr == self._country_code_filter
+
+            if 'nuts_level' in self.data_filter:
+                nuts_mask = self._tran_nuts_arr == self.data_filter['nuts_level']
+                mask = nuts_mask if mask is None else mask & nuts_mask
+
+            if mask is None:
+                self._filter_cache['tran'] = self.tran_data
+            else:
+                self._filter_cache['tran'] = list(compress(self.tran_data, mask))
+        return self._filter_cache['tran']
     
     def get_summary_stats(self) -> Dict[str, Any]:
         env_filtered = self.get_filtered_env_data()
@@ -1,99 +1,371 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+import numpy as np
 import plotly.graph_objects as go
-from typing import Dict, Any
-from utils.consts import CHART_CONFIG
+import plotly.io as pio
+from typing import Dict, Any, List
+from ..data.models import RegionData
+from ..utils.consts import CHART_CONFIG
+
+try:
+    from plotly_resampler import FigureResampler
+    HAS_RESAMPLER = True
+except ImportError:
+    HAS_RESAMPLER = False
+
+NUTS_COLOR_TABLE = np.array(['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd'])
+
+# Past this many bars the per-bar text nodes dominate browser render
+# time, so dense figures fall back to hover-only labels.
+MAX_LABELED_BARS = 500
+
+_chart_pool = None
+
+
+def _get_chart_pool() -> ProcessPoolExecutor:
+    global _chart_pool
+    if _chart_pool is None:
+        _chart_pool = ProcessPoolExecutor(max_workers=os.cpu_count())
+    return _chart_pool
+
+
+def _build_chart(method_name: str, args: tuple) -> go.Figure:
+    return getattr(ChartVisualizer(), method_name)(*args)
+
+
+def _top_n_indices(values: np.ndarray, n: int) -> np.ndarray:
+    n = min(n, len(values))
+    if not n:
+        return np.empty(0, dtype=np.intp)
+    idx = np.argpartition(-values, n - 1)[:n]
+    return idx[np.argsort(-values[idx])]
+
+
+@lru_cache(maxsize=32)
+def _y_axis_label(data_source: str) -> str:
+    lowered = data_source.lower()
+    if any(marker in lowered for marker in ('zutylizowane', 'environmental')):
+        return "Liczba zutylizowanych pojazdów"
+    return "Liczba pojazdów elektrycznych"
+
+
+def _extract(data: Any, *keys, default=()):
+    # Accepts any mapping whose columns are lists, NumPy arrays, or
+    # pandas/Polars/Arrow series — anything exposing to_numpy comes back
+    # as an ndarray view without an import on the optional libraries.
+    for key in keys:
+        if key in data:
+            column = data[key]
+            to_numpy = getattr(column, 'to_numpy', None)
+            if to_numpy is not None:
+                return to_numpy()
+            return column
+    return default
+
+
+def _format_labels(values: np.ndarray) -> np.ndarray:
+    labels = np.full(values.shape, '', dtype=object)
+    mask = values > 0
+    labels[mask] = [f'{v:,.0f}' for v in values[mask]]
+    return labels
 
 
 class ChartVisualizer:
     
-    def __init__(self):
+    def __init__(self, use_webgl: bool = True):
+        self.use_webgl = use_webgl
         self.color_palette = CHART_CONFIG['COLORS']
         self.width = CHART_CONFIG['WIDTH']
         self.height = CHART_CONFIG['HEIGHT']
         self.font_size = CHART_CONFIG['FONT_SIZE']
+        self._bar_hover = (
+            '<b>%{fullData.name}</b><br>'
+            'Rok: %{x}<br>'
+            'Wartość: %{y:,.0f}<br>'
+            '<extra></extra>'
+        )
+        self._breakdown_hover = (
+            '<b>%{y}</b><br>'
+            'Wartość: %{x:,.0f}<br>'
+            '<extra></extra>'
+        )
+        self._register_template()
+        # Pre-validated layout pieces shared by the bar and line charts;
+        # update_layout(**dict) then only merges, it does not rebuild.
+        self._unified_hover_layout = {
+            'hovermode': 'x unified',
+            'legend': {
+                'orientation': 'h',
+                'yanchor': 'bottom',
+                'y': 1.02,
+                'xanchor': 'right',
+                'x': 1,
+                'font': {'color': 'black'}
+            }
+        }
+        self._region_index_cache: Dict[int, tuple] = {}
+        self._color_cache: Dict[int, np.ndarray] = {}
+        self._empty_layout = go.Layout(
+            template='mappy',
+            xaxis=dict(showgrid=False, showticklabels=False, zeroline=False, showline=False),
+            yaxis=dict(showgrid=False, showticklabels=False, zeroline=False, showline=False)
+        )
+
+    def _colors_for(self, n: int) -> np.ndarray:
+        colors = self._color_cache.get(n)
+        if colors is None:
+            reps = n // len(self.color_palette) + 1
+            colors = self._color_cache[n] = np.tile(self.color_palette, reps)[:n]
+        return colors
+
+    def _register_template(self):
+        if 'mappy' in pio.templates:
+            return
+        axis_style = dict(
+            showgrid=True,
+            gridcolor='lightgray',
+            showline=True,
+            linecolor='black',
+            linewidth=2,
+            title_font=dict(size=14, color='black', family='Arial'),
+            tickfont=dict(size=12, color='black', family='Arial')
+        )
+        pio.templates['mappy'] = go.layout.Template(layout=go.Layout(
+            width=self.width,
+            height=self.height,
+            font={'size': self.font_size, 'color': 'black', 'family': 'Arial'},
+            title={'x': 0.5, 'xanchor': 'center',
+                   'font': {'size': 18, 'color': 'black', 'family': 'Arial'}},
+            plot_bgcolor='white',
+            paper_bgcolor='white',
+            xaxis=axis_style,
+            yaxis={**axis_style, 'tickformat': ',.0f'}
+        ))
     
     def create_bar_chart(self, data: Dict[str, Any], data_source: str) -> go.Figure:
         
-        fig = go.Figure()
+        countries = _extract(data, 'countries', 'regions', 'names')
+        years = _extract(data, 'years')
+        values = _extract(data, 'values')
         
-        countries = data.get('countries', data.get('regions', data.get('names', [])))
-        years = data.get('years', [])
-        values = data.get('values', [])
-        
-        if not countries or not years or not values:
+        if not len(countries) or not len(years) or not len(values):
             return self._create_empty_chart("Brak danych do wyświetlenia")
         
+        with_labels = len(countries) * len(years) <= MAX_LABELED_BARS
+        colors = self._colors_for(len(countries))
+
+        traces = []
         for i, country in enumerate(countries):
-            country_values = values[i] if i < len(values) else []
-            color = self.color_palette[i % len(self.color_palette)]
+            country_values = np.asarray(values[i] if i < len(values) else [], dtype=np.float64)
             
-            fig.add_trace(go.Bar(
-                name=country,
-                x=years,
-                y=country_values,
-                marker_color=color,
-                hovertemplate=(
-                    '<b>%{fullData.name}</b><br>'
-                    'Rok: %{x}<br>'
-                    'Wartość: %{y:,.0f}<br>'
-                    '<extra></extra>'
-                ),
-                text=[f'{v:,.0f}' if v > 0 else '' for v in country_values],
-                textposition='auto',
-                textfont=dict(color='black', size=10)
-            ))
-        
-        title = f"Porównanie: {data_source}"
+            trace = {
+                'type': 'bar',
+                'name': country,
+                'x': years,
+                'y': country_values,
+                'marker': {'color': colors[i]},
+                'hovertemplate': self._bar_hover
+            }
+            if with_labels:
+                trace.update({
+                    'text': _format_labels(country_values),
+                    'textposition': 'auto',
+                    'textfont': {'color': 'black', 'size': 10}
+                })
+            traces.append(trace)
         
+        fig = go.Figure({'data': traces}, skip_invalid=True)
         fig.update_layout(
-            title={
-                'text': title,
-                'x': 0.5,
-                'xanchor': 'center',
-                'font': {'size': 18, 'color': 'black', 'family': 'Arial'}
-            },
+            template='mappy',
+            title_text=f"Porównanie: {data_source}",
             xaxis_title='Rok',
-            yaxis_title=self._get_y_axis_label(data_source),
+            yaxis_title=_y_axis_label(data_source),
             barmode='group',
-            width=self.width,
-            height=self.height,
-            font={'size': self.font_size, 'color': 'black', 'family': 'Arial'},
-            hovermode='x unified',
-            legend={
-                'orientation': 'h',
-                'yanchor': 'bottom',
-                'y': 1.02,
-                'xanchor': 'right',
-                'x': 1,
-                'font': {'color': 'black'}
-            },
-            plot_bgcolor='white',
-            paper_bgcolor='white'
+            **self._unified_hover_layout
         )
         
-        fig.update_xaxes(
-            showgrid=True, 
-            gridcolor='lightgray',
-            showline=True, 
-            linecolor='black',
-            title_font=dict(size=14, color='black', family='Arial'),
-            tickfont=dict(size=12, color='black', family='Arial'),
-            linewidth=2
+        return fig
+    
+    def create_line_chart(self, data: Dict[str, Any], data_source: str,
+                          max_points: int = 2000) -> go.Figure:
+        countries = _extract(data, 'countries', 'regions', 'names')
+        years = np.asarray(_extract(data, 'years'))
+        values = _extract(data, 'values')
+
+        if not len(countries) or not len(years) or not len(values):
+            return self._create_empty_chart("Brak danych do wyświetlenia")
+
+        # Scattergl draws all points in one WebGL context instead of one
+        # DOM node per point; browsers cap contexts, but MapPy shows a
+        # single chart at a time.
+        trace_type = 'scattergl' if self.use_webgl else 'scatter'
+        colors = self._colors_for(len(countries))
+
+        traces = []
+        for i, country in enumerate(countries):
+            country_values = np.asarray(values[i] if i < len(values) else (), dtype=np.float64)
+
+            traces.append({
+                'type': trace_type,
+                'name': country,
+                'x': years,
+                'y': country_values,
+                'mode': 'lines+markers',
+                'line': {'color': colors[i], 'width': 2},
+                'marker': {'size': 6},
+                'hovertemplate': self._bar_hover
+            })
+
+        if HAS_RESAMPLER:
+            fig = FigureResampler(go.Figure(), default_n_shown_samples=max_points)
+            for trace in traces:
+                fig.add_trace(trace)
+        else:
+            fig = go.Figure({'data': traces}, skip_invalid=True)
+
+        fig.update_layout(
+            template='mappy',
+            title_text=f"Trend: {data_source}",
+            xaxis_title='Rok',
+            yaxis_title=_y_axis_label(data_source),
+            **self._unified_hover_layout
         )
-        fig.update_yaxes(
-            showgrid=True, 
-            gridcolor='lightgray',
-            showline=True, 
-            linecolor='black',
-            tickformat=',.0f',
-            title_font=dict(size=14, color='black', family='Arial'),
-            tickfont=dict(size=12, color='black', family='Arial'),
-            linewidth=2
+
+        return fig
+
+    def create_charts_batch(self, specs: List[tuple]) -> List[go.Figure]:
+        if len(specs) <= 1:
+            return [getattr(self, method_name)(*args) for method_name, args in specs]
+        pool = _get_chart_pool()
+        futures = [pool.submit(_build_chart, method_name, args) for method_name, args in specs]
+        return [future.result() for future in futures]
+
+    def create_top_n_chart(self, names: List[str], values, n: int,
+                           data_source: str) -> go.Figure:
+        values = np.asarray(values, dtype=np.float64)
+
+        if not len(values):
+            return self._create_empty_chart("Brak danych do wyświetlenia")
+
+        idx = _top_n_indices(values, n)
+        n = len(idx)
+        top_values = values[idx]
+
+        fig = go.Figure({'data': [{
+            'type': 'bar',
+            'x': [names[i] for i in idx],
+            'y': top_values,
+            'marker': {'color': self._colors_for(n)},
+            'text': _format_labels(top_values),
+            'textposition': 'auto',
+            'textfont': {'color': 'black', 'size': 10},
+            'hovertemplate': self._bar_hover,
+            'name': data_source
+        }]}, skip_invalid=True)
+
+        fig.update_layout(
+            template='mappy',
+            title_text=f"Top {n}: {data_source}",
+            yaxis_title=_y_axis_label(data_source),
+            showlegend=False
         )
-        
+
         return fig
-    
+
+    def create_pie_chart(self, names: List[str], values, data_source: str,
+                         n: int = 10) -> go.Figure:
+        values = np.asarray(values, dtype=np.float64)
+
+        if not len(values):
+            return self._create_empty_chart("Brak danych do wyświetlenia")
+
+        idx = _top_n_indices(values, n)
+        n = len(idx)
+
+        fig = go.Figure({'data': [{
+            'type': 'pie',
+            'labels': [names[i] for i in idx],
+            'values': values[idx],
+            'marker': {'colors': self._colors_for(n)},
+            'hovertemplate': (
+                '<b>%{label}</b><br>'
+                'Wartość: %{value:,.0f}<br>'
+                'Udział: %{percent}<br>'
+                '<extra></extra>'
+            )
+        }]}, skip_invalid=True)
+
+        fig.update_layout(
+            template='mappy',
+            title_text=f"Udział: {data_source}"
+        )
+
+        return fig
+
+    def _region_rows(self, regions: List[RegionData], country_code: str) -> np.ndarray:
+        key = id(regions)
+        cached = self._region_index_cache.get(key)
+
+        if cached is None or cached[0] != len(regions):
+            grouped: Dict[str, list] = {}
+            for i, region in enumerate(regions):
+                grouped.setdefault(region.country_code, []).append(i)
+            index = {code: np.asarray(rows, dtype=np.intp) for code, rows in grouped.items()}
+            # One entry is enough: the manager swaps whole lists on reload.
+            self._region_index_cache = {key: (len(regions), index)}
+            cached = self._region_index_cache[key]
+
+        return cached[1].get(country_code, np.empty(0, dtype=np.intp))
+
+    def create_regional_breakdown_chart(self, regions: List[RegionData], year: int,
+                                        country_code: str) -> go.Figure:
+        rows = self._region_rows(regions, country_code.upper())
+
+        if not len(rows):
+            return self._create_empty_chart("Brak danych do wyświetlenia")
+
+        subset = [regions[i] for i in rows]
+        values = np.concatenate([r.get_values_for_range(year, year) for r in subset])
+        keep = np.flatnonzero(values > 0)
+
+        if not len(keep):
+            return self._create_empty_chart("Brak danych do wyświetlenia")
+
+        top = keep[_top_n_indices(values[keep], 15)]
+        bar_values = values[top]
+        levels = np.array([subset[i].nuts_level for i in top], dtype=np.int8)
+        colors = NUTS_COLOR_TABLE[levels.clip(0, len(NUTS_COLOR_TABLE) - 1)]
+
+        trace = {
+            'type': 'bar',
+            'x': bar_values,
+            'y': [subset[i].region_name for i in top],
+            'orientation': 'h',
+            'marker': {'color': colors.tolist()},
+            'hovertemplate': self._breakdown_hover
+        }
+        if len(bar_values) <= MAX_LABELED_BARS:
+            trace.update({
+                'text': _format_labels(bar_values),
+                'textposition': 'auto',
+                'textfont': {'color': 'black', 'size': 10}
+            })
+
+        fig = go.Figure({'data': [trace]}, skip_invalid=True)
+
+        fig.update_layout(
+            template='mappy',
+            title_text=f"Regiony: {country_code.upper()} ({year})",
+            xaxis_title='Liczba pojazdów elektrycznych',
+            xaxis_tickformat=',.0f',
+            yaxis={'autorange': 'reversed', 'tickformat': None}
+        )
+
+        return fig
+
     def _create_empty_chart(self, message: str) -> go.Figure:
-        fig = go.Figure()
+        fig = go.Figure(layout=self._empty_layout)
         
         fig.add_annotation(
             text=message,
@@ -104,20 +376,4 @@ class ChartVisualizer:
             showarrow=False
         )
         
-        fig.update_layout(
-            width=self.width,
-            height=self.height,
-            plot_bgcolor='white',
-            paper_bgcolor='white',
-            xaxis=dict(showgrid=False, showticklabels=False, zeroline=False),
-            yaxis=dict(showgrid=False, showticklabels=False, zeroline=False),
-            font={'family': 'Arial'}
-        )
-        
         return fig
-    
-    def _get_y_axis_label(self, data_source: str) -> str:
-        if "zutylizowane" in data_source.lower() or "environmental" in data_source.lower():
-            return "Liczba zutylizowanych pojazdów"
-        else:
-            return "Liczba pojazdów elektrycznych"
@@ -1,9 +1,43 @@
+from functools import lru_cache
 import folium
 import pandas as pd
 from typing import List, Dict, Any, Union, Optional
 import logging
-from data.models import CountryData, RegionData
-from utils.consts import MAP_CONFIG
+from ..data.models import CountryData, RegionData
+from ..utils.consts import MAP_CONFIG, COUNTRY_COORDINATES
+
+@lru_cache(maxsize=8)
+def _data_type_name(data_type: str) -> str:
+    if data_type == 'environmental':
+        return "Pojazdy zutylizowane"
+    return "Pojazdy elektryczne"
+
+
+NAME_MAPPINGS = {
+    'polska': 'poland',
+    'niemcy': 'germany',
+    'francja': 'france',
+    'hiszpania': 'spain',
+    'włochy': 'italy',
+    'czechy': 'czechia',
+    'węgry': 'hungary',
+    'mazovia': 'mazowieckie',
+    'silesia': 'śląskie',
+    'greater poland': 'wielkopolskie',
+    'lesser poland': 'małopolskie',
+    'lower silesia': 'dolnośląskie',
+    'lodz': 'łódzkie',
+    'west pomerania': 'zachodniopomorskie',
+    'pomerania': 'pomorskie',
+    'warmia-masuria': 'warmińsko-mazurskie',
+    'kuyavia-pomerania': 'kujawsko-pomorskie',
+    'podlachia': 'podlaskie',
+    'lublin': 'lubelskie',
+    'subcarpathia': 'podkarpackie',
+    'holy cross': 'świętokrzyskie',
+    'lubusz': 'lubuskie',
+    'opole': 'opolskie'
+}
 
 
 class MapVisualizer:
@@ -59,27 +93,27 @@ class MapVisualizer:
         is_poland_mode = view_mode.lower() in ['poland', 'polska']
         
         for item in data:
-            name_lower = item.country_name.lower() if isinstance(item, CountryData) else item.region_name.lower()
+            is_country = item.TYPE == 'country'
+            name_lower = item.display_name.lower()
             if any(skip in name_lower for skip in skip_names):
                 continue
-            
+
             if is_poland_mode:
                 should_include = False
-                
-                if isinstance(item, RegionData):
+
+                if not is_country:
                     if (item.country_code and item.country_code.upper() == 'PL') or \
                        (item.region_code and item.region_code.startswith('PL')):
                         should_include = True
-                
-                elif isinstance(item, CountryData):
+
+                else:
                     poland_variants = ['poland', 'polska', 'republic of poland', 'pol']
-                    country_name_lower = item.country_name.lower()
                     country_code_upper = (item.country_code or '').upper()
-                    
-                    if any(variant in country_name_lower for variant in poland_variants) or \
+
+                    if any(variant in name_lower for variant in poland_variants) or \
                        country_code_upper == 'PL':
                         should_include = True
-                
+
                 if not should_include:
                     continue
             
@@ -96,7 +130,7 @@ class MapVisualizer:
                 avg_value = sum(values) / len(values)
                 latest_value = item.get_value_for_year(end_year) or 0
                 
-                if isinstance(item, CountryData):
+                if is_country:
                     records.append({
                         'name': item.country_name,
                         'code': item.country_code,
@@ -153,48 +187,19 @@ class MapVisualizer:
                 ).add_to(m)
     
     def _get_coordinates_from_consts(self, name: str) -> Optional[tuple]:
-        from utils.consts import COUNTRY_COORDINATES
-        
         name_lower = name.lower().strip()
-        
+
         if name_lower in COUNTRY_COORDINATES:
             return COUNTRY_COORDINATES[name_lower]
-        
-        name_mappings = {
-            'polska': 'poland',
-            'niemcy': 'germany', 
-            'francja': 'france',
-            'hiszpania': 'spain',
-            'włochy': 'italy',
-            'czechy': 'czechia',
-            'węgry': 'hungary',
-            'mazovia': 'mazowieckie',
-            'silesia': 'śląskie',
-            'greater poland': 'wielkopolskie',
-            'lesser poland': 'małopolskie',
-            'lower silesia': 'dolnośląskie',
-            'lodz': 'łódzkie',
-            'west pomerania': 'zachodniopomorskie',
-            'pomerania': 'pomorskie',
-            'warmia-masuria': 'warmińsko-mazurskie',
-            'kuyavia-pomerania': 'kujawsko-pomorskie',
-            'podlachia': 'podlaskie',
-            'lublin': 'lubelskie',
-            'subcarpathia': 'podkarpackie',
-            'holy cross': 'świętokrzyskie',
-            'lubusz': 'lubuskie',
-            'opole': 'opolskie'
-        }
-        
-        if name_lower in name_mappings:
-            mapped_name = name_mappings[name_lower]
-            if mapped_name in COUNTRY_COORDINATES:
-                return COUNTRY_COORDINATES[mapped_name]
-        
+
+        mapped_name = NAME_MAPPINGS.get(name_lower)
+        if mapped_name is not None and mapped_name in COUNTRY_COORDINATES:
+            return COUNTRY_COORDINATES[mapped_name]
+
         for key, coords in COUNTRY_COORDINATES.items():
             if key in name_lower or name_lower in key:
                 return coords
-        
+
         return None
     
     def _calculate_radius(self, value: float, min_val: float, max_val: float) -> float:
@@ -219,7 +224,7 @@ class MapVisualizer:
             return
         
         legend_text = f"""
-        {self._get_data_type_name()}
+        {_data_type_name(self.data_type)}
         Min: {data['value'].min():,.0f}
         Max: {data['value'].max():,.0f}
         """
@@ -239,9 +244,3 @@ class MapVisualizer:
             popup="Brak danych dla wybranych parametrów",
             icon=folium.Icon(color='red', icon='info-sign')
         ).add_to(m)
-    
-    def _get_data_type_name(self) -> str:
-        if self.data_type == 'environmental':
-            return "Pojazdy zutylizowane"
-        else:
-            return "Pojazdy elektryczne"
@@ -4,6 +4,7 @@ from reportlab.lib.styles import getSampleStyleSheet
 from reportlab.lib.units import inch
 import plotly.graph_objects as go
 import io
+from itertools import islice
 from PIL import Image as PILImage
 from datetime import datetime
 import os
@@ -35,7 +36,7 @@ class PDFExporter:
         
         info_text = f"""
         Zakres lat: {year_range[0]} - {year_range[1]}<br/>
-        Kraje/regiony: {', '.join(countries[:5]) if countries else 'wszystkie'}<br/>
+        Kraje/regiony: {', '.join(islice(countries, 5)) if countries else 'wszystkie'}<br/>
         Data generowania: {datetime.now().strftime("%d.%m.%Y %H:%M")}
         """
         info = Paragraph(info_text, self.styles['Normal'])